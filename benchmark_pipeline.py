@@ -0,0 +1,408 @@
+"""
+PPT处理流程基准测试脚本
+
+在进程内合成不同规模的PPT（幻灯片数、每页形状数、每个形状的文本段数、嵌入图片），
+分别测量 TemplateParser.parse、PPTGenerator.generate，以及通过FastAPI测试客户端的
+上传、生成、预览和下载接口，结果以JSON输出，便于发布前做回归比对。
+
+用法:
+    python benchmark_pipeline.py
+    python benchmark_pipeline.py --sizes small,medium --repeat 10 --api --output bench.json
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import shutil
+import logging
+import argparse
+import platform
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+from pptx import Presentation
+from pptx.util import Inches, Pt
+from PIL import Image
+
+try:
+    import resource
+except ImportError:  # Windows没有resource模块
+    resource = None
+
+# 配置日志
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# 分级的合成PPT规模
+DECK_SIZES = {
+    "small": {"slides": 10, "shapes_per_slide": 2, "runs_per_shape": 2, "images_per_slide": 0},
+    "medium": {"slides": 50, "shapes_per_slide": 5, "runs_per_shape": 4, "images_per_slide": 1},
+    "large": {"slides": 200, "shapes_per_slide": 8, "runs_per_shape": 6, "images_per_slide": 2},
+}
+
+PPTX_MIME = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+
+
+def create_synthetic_ppt(file_path, slides, shapes_per_slide, runs_per_shape, images_per_slide):
+    """按给定规模合成测试PPT"""
+    prs = Presentation()
+    blank_layout = prs.slide_layouts[6]
+
+    for slide_idx in range(slides):
+        slide = prs.slides.add_slide(blank_layout)
+
+        for shape_idx in range(shapes_per_slide):
+            textbox = slide.shapes.add_textbox(
+                Inches(0.5), Inches(0.5 + shape_idx * 0.8), Inches(6), Inches(0.7)
+            )
+            paragraph = textbox.text_frame.paragraphs[0]
+            for run_idx in range(runs_per_shape):
+                run = paragraph.add_run()
+                run.text = f"第{slide_idx + 1}页 文本框{shape_idx + 1} 段落{run_idx + 1} "
+                run.font.size = Pt(14 + run_idx % 4 * 2)
+                run.font.bold = run_idx % 2 == 0
+
+        # 每页使用不同颜色的图片，避免媒体文件被合并
+        for image_idx in range(images_per_slide):
+            image = Image.new("RGB", (800, 600), ((slide_idx * 37) % 256, (image_idx * 91) % 256, 128))
+            image_stream = BytesIO()
+            image.save(image_stream, format="PNG")
+            image_stream.seek(0)
+            slide.shapes.add_picture(image_stream, Inches(7), Inches(0.5 + image_idx * 2), Inches(2.5))
+
+    prs.save(file_path)
+    return file_path
+
+
+def percentiles(samples):
+    """计算延迟分位数（毫秒）"""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+
+    def pick(p):
+        # 最近秩法：第 ceil(p/100*n) 个样本，用整数运算避免浮点误差
+        rank = -(-p * len(ordered) // 100)
+        index = min(len(ordered) - 1, max(0, rank - 1))
+        return round(ordered[index] * 1000, 3)
+
+    total = sum(ordered)
+    return {
+        "count": len(ordered),
+        "min_ms": round(ordered[0] * 1000, 3),
+        "p50_ms": pick(50),
+        "p90_ms": pick(90),
+        "p99_ms": pick(99),
+        "max_ms": round(ordered[-1] * 1000, 3),
+        "throughput_per_sec": round(len(ordered) / total, 3) if total > 0 else None,
+    }
+
+
+def peak_rss_mb():
+    """返回进程峰值RSS（MB），不支持的平台返回None"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS以字节为单位，Linux以KB为单位
+    if sys.platform == "darwin":
+        return round(peak / (1024 * 1024), 2)
+    return round(peak / 1024, 2)
+
+
+def build_content_mappings(template):
+    """为模板中所有文本元素构建内容映射"""
+    from backend.core.ppt_generator import PPTContentMapping
+    from backend.core.ai_engine import ContentResponse
+    from backend.core.ai_engine.content_generator import ContentType
+
+    content_mappings = []
+    for slide in template.slides:
+        for idx, element in enumerate(slide.elements):
+            if element.element_type != "text":
+                continue
+            content_response = ContentResponse(
+                request_id=str(uuid.uuid4()),
+                content=f"基准测试内容 {slide.slide_id} {element.element_id}",
+                content_type=ContentType.TITLE if idx == 0 else ContentType.SUBTITLE,
+                metadata={}
+            )
+            content_mappings.append(PPTContentMapping(
+                template_id=template.template_id,
+                slide_id=slide.slide_id,
+                element_id=element.element_id,
+                content_response=content_response
+            ))
+    return content_mappings
+
+
+def bench_in_process(deck_path, output_dir, repeat):
+    """进程内测量模板解析和PPT生成"""
+    from backend.core.template_parser import TemplateParser
+    from backend.core.ppt_generator import PPTGenerator
+
+    parse_samples = []
+    template = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        template = TemplateParser(deck_path).parse()
+        parse_samples.append(time.perf_counter() - start)
+
+    if not template:
+        raise RuntimeError(f"无法解析模板文件: {deck_path}")
+
+    content_mappings = build_content_mappings(template)
+    ppt_generator = PPTGenerator(output_dir)
+
+    generate_samples = []
+    output_bytes = None
+    for _ in range(repeat):
+        task_id = str(uuid.uuid4())
+        start = time.perf_counter()
+        task = ppt_generator.create_task(
+            template=template,
+            content_mappings=content_mappings,
+            task_id=task_id
+        )
+        output_path = ppt_generator.generate(task)
+        generate_samples.append(time.perf_counter() - start)
+        output_bytes = os.path.getsize(output_path)
+        os.remove(output_path)
+
+    return {
+        "parse": percentiles(parse_samples),
+        "generate": percentiles(generate_samples),
+        "content_mappings": len(content_mappings),
+        "output_bytes": output_bytes,
+    }
+
+
+def bench_api(client, deck_path, repeat, poll_timeout=30.0):
+    """
+    通过FastAPI测试客户端测量上传、生成、预览和下载
+
+    失败的请求只计数，不计入延迟样本，也不中断其余测量
+    """
+    upload_samples = []
+    generate_samples = []
+    preview_samples = []
+    download_samples = []
+    result = {
+        "upload": {},
+        "generate": {},
+        "preview": {},
+        "download": {},
+        "upload_failed": 0,
+        "failed": 0,
+        "download_failed": 0,
+        "preview_failed": 0,
+    }
+
+    template_data = None
+    for _ in range(repeat):
+        with open(deck_path, "rb") as f:
+            files = {"file": (os.path.basename(deck_path), f, PPTX_MIME)}
+            start = time.perf_counter()
+            response = client.post("/templates/upload", files=files)
+            elapsed = time.perf_counter() - start
+        if response.status_code != 200:
+            logger.error(f"上传模板失败: {response.status_code} - {response.text[:200]}")
+            result["upload_failed"] += 1
+            continue
+        upload_samples.append(elapsed)
+        template_data = response.json()
+
+    result["upload"] = percentiles(upload_samples)
+    if template_data is None:
+        # 没有可用的模板，后续测量无法进行
+        return result
+
+    template_id = template_data["template_id"]
+    content_mappings = []
+    for slide in template_data["slides"]:
+        for element in slide["elements"]:
+            if element["element_type"] != "text":
+                continue
+            content_mappings.append({
+                "request_id": str(uuid.uuid4()),
+                "slide_id": slide["slide_id"],
+                "element_id": element["element_id"],
+                "content": f"基准测试内容 {slide['slide_id']} {element['element_id']}",
+                "content_type": "title",
+                "metadata": {}
+            })
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.post("/ppt/generate", json={
+            "template_id": template_id,
+            "content_mappings": content_mappings
+        })
+        if response.status_code != 200:
+            logger.error(f"创建PPT生成任务失败: {response.status_code} - {response.text[:200]}")
+            result["failed"] += 1
+            continue
+        task_id = response.json()["task_id"]
+
+        # 等待任务完成，计入端到端生成时间
+        deadline = time.perf_counter() + poll_timeout
+        status = None
+        while time.perf_counter() < deadline:
+            status = client.get(f"/ppt/status/{task_id}").json().get("status")
+            if status in ("completed", "failed"):
+                break
+            time.sleep(0.01)
+        elapsed = time.perf_counter() - start
+
+        # 失败或超时的任务只计数，不计入延迟样本
+        if status != "completed":
+            logger.error(f"PPT生成任务未完成: {task_id}, 状态: {status}")
+            result["failed"] += 1
+            continue
+        generate_samples.append(elapsed)
+
+        start = time.perf_counter()
+        response = client.get(f"/ppt/download/{task_id}")
+        elapsed = time.perf_counter() - start
+        if response.status_code != 200:
+            logger.error(f"下载PPT失败: {task_id}, {response.status_code} - {response.text[:200]}")
+            result["download_failed"] += 1
+            continue
+        download_samples.append(elapsed)
+
+    for slide_index in range(min(len(template_data["slides"]), repeat)):
+        start = time.perf_counter()
+        response = client.get(f"/templates/{template_id}/preview", params={"slide_index": slide_index})
+        elapsed = time.perf_counter() - start
+        if response.status_code != 200:
+            logger.error(f"获取预览失败: 幻灯片 {slide_index}, {response.status_code} - {response.text[:200]}")
+            result["preview_failed"] += 1
+            continue
+        preview_samples.append(elapsed)
+
+    result["generate"] = percentiles(generate_samples)
+    result["preview"] = percentiles(preview_samples)
+    result["download"] = percentiles(download_samples)
+    return result
+
+
+def run_phase(phase, deck_path, work_dir, repeat):
+    """
+    在子进程中运行单个测量阶段，返回测量结果和该进程的峰值RSS
+    """
+    if phase == "in_process":
+        output_dir = os.path.join(work_dir, "outputs")
+        os.makedirs(output_dir, exist_ok=True)
+        result = bench_in_process(deck_path, output_dir, repeat)
+    else:
+        # API服务使用相对于工作目录的uploads/和outputs/，切换到临时目录后
+        # 本次上传的模板和生成的PPT都会随临时目录一起删除
+        os.chdir(work_dir)
+        from fastapi.testclient import TestClient
+        from backend.api.main import app
+        # 以上下文管理器方式使用，使应用的启动/关闭事件运行，事件循环在请求之间保持
+        with TestClient(app) as client:
+            result = bench_api(client, deck_path, repeat)
+
+    # 子进程只运行这一个阶段，峰值不含合成PPT和其他规模，但包含解释器和依赖导入的基线
+    result["peak_rss_mb"] = peak_rss_mb()
+    return result
+
+
+def run_phase_isolated(phase, deck_path, work_dir, repeat):
+    """在新的子进程中运行测量阶段，使峰值内存按阶段独立统计"""
+    mp_context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=mp_context) as executor:
+        return executor.submit(run_phase, phase, deck_path, work_dir, repeat).result()
+
+
+def run_benchmarks(size_names, repeat, with_api):
+    """运行所有规模的基准测试"""
+    work_dir = tempfile.mkdtemp(prefix="ppt_bench_")
+    phases = ["in_process", "api"] if with_api else ["in_process"]
+
+    results = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "cases": [],
+    }
+
+    try:
+        for size_name in size_names:
+            spec = DECK_SIZES[size_name]
+            deck_path = os.path.join(work_dir, f"bench_{size_name}.pptx")
+            create_synthetic_ppt(deck_path, **spec)
+            logger.info(f"已合成 {size_name} 测试PPT: {spec}")
+
+            case = {
+                "size": size_name,
+                "spec": spec,
+                "deck_bytes": os.path.getsize(deck_path),
+            }
+            for phase in phases:
+                try:
+                    case[phase] = run_phase_isolated(phase, deck_path, work_dir, repeat)
+                except Exception as e:
+                    # 单个阶段出错时记录错误，继续测量其余阶段和规模
+                    logger.error(f"{size_name} 的 {phase} 阶段出错: {e}", exc_info=True)
+                    case[phase] = {"error": str(e)}
+            results["cases"].append(case)
+
+            in_process = case["in_process"]
+            if "error" not in in_process:
+                logger.info(f"{size_name} 完成: 解析p50={in_process['parse']['p50_ms']}ms, "
+                            f"生成p50={in_process['generate']['p50_ms']}ms, "
+                            f"峰值RSS={in_process['peak_rss_mb']}MB")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return results
+
+
+def has_failures(results):
+    """是否有阶段出错或请求失败，用于发布门禁"""
+    failure_keys = ("error", "upload_failed", "failed", "download_failed", "preview_failed")
+    for case in results["cases"]:
+        for key, phase_result in case.items():
+            if not isinstance(phase_result, dict) or key == "spec":
+                continue
+            if any(phase_result.get(failure_key) for failure_key in failure_keys):
+                return True
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PPT处理流程基准测试")
+    parser.add_argument("--sizes", default="small,medium,large",
+                        help=f"要运行的规模，逗号分隔，可选: {','.join(DECK_SIZES)}")
+    parser.add_argument("--repeat", type=int, default=5, help="每项测量的重复次数")
+    parser.add_argument("--api", action="store_true", help="同时通过FastAPI测试客户端测量接口")
+    parser.add_argument("--output", help="结果JSON的输出路径，默认输出到标准输出")
+    args = parser.parse_args()
+
+    size_names = [name.strip() for name in args.sizes.split(",") if name.strip()]
+    unknown = [name for name in size_names if name not in DECK_SIZES]
+    if unknown:
+        parser.error(f"未知规模: {', '.join(unknown)}")
+
+    results = run_benchmarks(size_names, max(1, args.repeat), args.api)
+    report = json.dumps(results, ensure_ascii=False, indent=2)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report)
+        logger.info(f"基准测试结果已保存: {args.output}")
+    else:
+        print(report)
+
+    if has_failures(results):
+        logger.error("基准测试存在出错的阶段或失败的请求")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,6 +10,30 @@ from datetime import datetime
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# 下载时按块写入文件，避免将整个PPT读入内存
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+def download_ppt(task_id):
+    """
+    流式下载生成的PPT并保存到当前目录
+    """
+    download_url = f"http://127.0.0.1:8000/ppt/download/{task_id}"
+    logger.info(f"开始下载PPT: {download_url}")
+    
+    # 使用with确保失败时也会关闭响应、释放连接
+    with requests.get(download_url, stream=True) as download_response:
+        if download_response.status_code != 200:
+            logger.error(f"下载PPT失败: {download_response.status_code} - {download_response.text}")
+            return False
+        
+        output_file = f"generated_ppt_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pptx"
+        with open(output_file, "wb") as f:
+            for chunk in download_response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                f.write(chunk)
+    
+    logger.info(f"已保存生成的PPT: {output_file}")
+    return True
+
 def generate_ppt(template_id, elements_data):
     """
     使用API生成PPT
@@ -80,20 +104,7 @@ def generate_ppt(template_id, elements_data):
                         
                         if status_data.get("status") == "completed":
                             # 下载生成的PPT
-                            download_url = f"http://127.0.0.1:8000/ppt/download/{task_id}"
-                            logger.info(f"开始下载PPT: {download_url}")
-                            
-                            download_response = requests.get(download_url)
-                            if download_response.status_code == 200:
-                                # 保存生成的PPT
-                                output_file = f"generated_ppt_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pptx"
-                                with open(output_file, "wb") as f:
-                                    f.write(download_response.content)
-                                logger.info(f"已保存生成的PPT: {output_file}")
-                                return True
-                            else:
-                                logger.error(f"下载PPT失败: {download_response.text}")
-                                return False
+                            return download_ppt(task_id)
                     elif status_response.status_code != 200:
                         logger.error(f"检查任务状态时出错: {status_response.status_code} - {status_response.text}")
                     
@@ -102,17 +113,9 @@ def generate_ppt(template_id, elements_data):
                 
                 # 尝试直接下载一次
                 logger.info("尝试直接下载PPT...")
-                download_url = f"http://127.0.0.1:8000/ppt/download/{task_id}"
                 try:
-                    download_response = requests.get(download_url)
-                    if download_response.status_code == 200:
-                        output_file = f"generated_ppt_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pptx"
-                        with open(output_file, "wb") as f:
-                            f.write(download_response.content)
-                        logger.info(f"已保存生成的PPT: {output_file}")
+                    if download_ppt(task_id):
                         return True
-                    else:
-                        logger.error(f"直接下载PPT失败: {download_response.status_code} - {download_response.text}")
                 except Exception as e:
                     logger.error(f"直接下载PPT时出错: {e}")
                 
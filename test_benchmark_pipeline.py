@@ -0,0 +1,109 @@
+"""
+基准测试脚本中不依赖后端的部分的测试
+"""
+import json
+
+from pptx import Presentation
+from pptx.enum.shapes import MSO_SHAPE_TYPE
+
+from benchmark_pipeline import percentiles, create_synthetic_ppt, bench_api, has_failures
+
+
+def test_percentiles_nearest_rank():
+    """分位数按最近秩法取样本"""
+    result = percentiles([5, 3, 1, 4, 2])
+    assert result["count"] == 5
+    assert result["min_ms"] == 1000
+    assert result["p50_ms"] == 3000
+    assert result["p90_ms"] == 5000
+    assert result["p99_ms"] == 5000
+    assert result["max_ms"] == 5000
+
+    result = percentiles(list(range(1, 11)))
+    assert result["p50_ms"] == 5000
+    assert result["p90_ms"] == 9000
+    assert result["p99_ms"] == 10000
+
+
+def test_percentiles_single_and_empty():
+    """单个样本时所有分位数相同，空样本返回空结果"""
+    result = percentiles([0.25])
+    assert result["p50_ms"] == result["p90_ms"] == result["p99_ms"] == 250
+    assert result["throughput_per_sec"] == 4
+    assert percentiles([]) == {}
+
+
+def test_create_synthetic_ppt(tmp_path):
+    """合成的PPT符合给定规模"""
+    file_path = str(tmp_path / "synthetic.pptx")
+    create_synthetic_ppt(file_path, slides=3, shapes_per_slide=2, runs_per_shape=4, images_per_slide=1)
+
+    prs = Presentation(file_path)
+    assert len(prs.slides) == 3
+    for slide in prs.slides:
+        textboxes = [shape for shape in slide.shapes if shape.has_text_frame]
+        pictures = [shape for shape in slide.shapes if shape.shape_type == MSO_SHAPE_TYPE.PICTURE]
+        assert len(textboxes) == 2
+        assert len(pictures) == 1
+        for textbox in textboxes:
+            runs = textbox.text_frame.paragraphs[0].runs
+            assert len(runs) == 4
+            assert runs[0].font.bold is True
+
+
+class FakeResponse:
+    def __init__(self, status_code, data=None):
+        self.status_code = status_code
+        self.data = data or {}
+        self.text = json.dumps(self.data)
+
+    def json(self):
+        return self.data
+
+
+class FakeClient:
+    """上传和生成正常、预览和下载失败的测试客户端"""
+
+    def post(self, url, **kwargs):
+        if url == "/templates/upload":
+            return FakeResponse(200, {
+                "template_id": "tpl",
+                "slides": [{"slide_id": "slide_0", "elements": [{"element_id": "shape_1", "element_type": "text"}]}],
+            })
+        return FakeResponse(200, {"task_id": "task"})
+
+    def get(self, url, **kwargs):
+        if url.startswith("/ppt/status/"):
+            return FakeResponse(200, {"status": "completed"})
+        return FakeResponse(500, {"detail": "error"})
+
+
+def test_bench_api_counts_failed_requests(tmp_path):
+    """预览和下载失败时只计数，保留上传和生成的测量结果"""
+    deck_path = tmp_path / "deck.pptx"
+    deck_path.write_bytes(b"deck")
+
+    result = bench_api(FakeClient(), str(deck_path), repeat=2)
+
+    assert result["upload"]["count"] == 2
+    assert result["generate"]["count"] == 2
+    assert result["download"] == {}
+    assert result["preview"] == {}
+    assert result["upload_failed"] == 0
+    assert result["failed"] == 0
+    assert result["download_failed"] == 2
+    assert result["preview_failed"] == 1
+
+
+def test_has_failures():
+    """任一阶段出错或有失败请求时判定为失败"""
+    ok_case = {
+        "size": "small",
+        "spec": {"slides": 10},
+        "in_process": {"parse": {"count": 5}},
+        "api": {"upload_failed": 0, "failed": 0, "download_failed": 0, "preview_failed": 0},
+    }
+    assert not has_failures({"cases": [ok_case]})
+    assert has_failures({"cases": [ok_case, dict(ok_case, in_process={"error": "boom"})]})
+    assert has_failures({"cases": [dict(ok_case, api=dict(ok_case["api"], preview_failed=1))]})
+    assert has_failures({"cases": [dict(ok_case, api=dict(ok_case["api"], failed=2))]})